@@ -0,0 +1,47 @@
+"""JSON encode/decode helpers, backed by orjson when it is installed.
+
+orjson is optional (``pip install "qianli[speedups]"``); without it these
+fall back to the stdlib json module. Output is equivalent JSON, not always
+byte-identical (floats: orjson writes 1e16 where json writes 1e+16).
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except
+# clause covers both backends.
+JSONDecodeError = json.JSONDecodeError
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps_bytes(obj):
+        """Encode as compact UTF-8 JSON bytes."""
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # orjson rejects strings that aren't valid UTF-8 (lone surrogates
+            # from surrogateescape'd argv); json escapes them as \udcXX.
+            return json.dumps(obj, separators=(",", ":")).encode()
+
+    def dumps_pretty(obj):
+        """Encode as 2-space indented JSON text, non-ASCII left as-is."""
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        except TypeError:
+            return json.dumps(obj, ensure_ascii=False, indent=2)
+
+else:
+    loads = json.loads
+
+    def dumps_bytes(obj):
+        """Encode as compact JSON bytes (ASCII-escaped, so always encodable)."""
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def dumps_pretty(obj):
+        """Encode as 2-space indented JSON text, non-ASCII left as-is."""
+        return json.dumps(obj, ensure_ascii=False, indent=2)
@@ -4,22 +4,33 @@ Sources: WeChat (Exauro), 36kr (agent-browser), XHS (xiaohongshu-mcp), Zhihu (Me
 """
 
 import argparse
-import json
+import itertools
 import sys
 import subprocess
 import re
+import threading
 from urllib.parse import quote
 
+from qianli._json import JSONDecodeError, dumps_pretty, loads
 from qianli.xhs_mcp import search_xhs, check_status as xhs_check_status
 
 
 # --- JS extractors ---
 
-JS_36KR = """(() => { const items = document.querySelectorAll('.kr-flow-article-item'); const results = []; for (const item of items) { const linkEl = item.querySelector('a[href*="/p/"]'); const titleEl = item.querySelector('.article-item-title'); const descEl = item.querySelector('.article-item-description'); const timeEl = item.querySelector('.kr-flow-bar-time'); const href = (linkEl && linkEl.getAttribute('href')) || ''; const title = (titleEl && titleEl.textContent && titleEl.textContent.trim()) || ''; const desc = (descEl && descEl.textContent && descEl.textContent.trim()) || ''; const date = (timeEl && timeEl.textContent && timeEl.textContent.trim()) || ''; if (title && href) { results.push({ source: '36kr', title, url: href.startsWith('/') ? 'https://36kr.com' + href : href, snippet: desc.substring(0, 120), author: '36氪', date }); } } return JSON.stringify(results); })()"""
+# One querySelectorAll per item, classified in document order, so each
+# .kr-flow-article-item subtree is walked once instead of four times.
+# Returns column arrays ({titles, urls, snippets, dates}) rather than one
+# object per result, so keys aren't repeated per item in the output;
+# search_36kr zips them back into rows.
+JS_36KR = """(() => { const items = document.querySelectorAll('.kr-flow-article-item'); const n = items.length; const titles = [], urls = [], snippets = [], dates = []; for (let i = 0; i < n; i++) { let linkEl = null, titleEl = null, descEl = null, timeEl = null; for (const el of items[i].querySelectorAll('a[href*="/p/"], .article-item-title, .article-item-description, .kr-flow-bar-time')) { if (!linkEl && el.matches('a[href*="/p/"]')) linkEl = el; if (!titleEl && el.classList.contains('article-item-title')) titleEl = el; if (!descEl && el.classList.contains('article-item-description')) descEl = el; if (!timeEl && el.classList.contains('kr-flow-bar-time')) timeEl = el; } const href = (linkEl && linkEl.getAttribute('href')) || ''; const title = (titleEl && titleEl.textContent && titleEl.textContent.trim()) || ''; const desc = (descEl && descEl.textContent && descEl.textContent.trim()) || ''; const date = (timeEl && timeEl.textContent && timeEl.textContent.trim()) || ''; if (title && href) { titles.push(title); urls.push(href.startsWith('/') ? 'https://36kr.com' + href : href); snippets.push(desc.substring(0, 120)); dates.push(date); } } return JSON.stringify({ titles, urls, snippets, dates }); })()"""
 
 
 # --- Search functions ---
 
+# exauro prints each hit as "N. <title>", followed by URL and snippet lines
+_EXAURO_TITLE_RE = re.compile(r"^\d+\.\s+(.+)$")
+_KR_COLUMNS = ("titles", "urls", "snippets", "dates")
+
 
 def search_wechat(query, limit=5):
     """Search WeChat articles via exauro CLI."""
@@ -37,7 +48,7 @@ def search_wechat(query, limit=5):
                 continue
 
             # Match "N. <title>"
-            match = re.match(r"^\d+\.\s+(.+)$", line)
+            match = _EXAURO_TITLE_RE.match(line)
             if match:
                 if current_item and "title" in current_item:
                     results.append(current_item)
@@ -69,29 +80,72 @@ def search_wechat(query, limit=5):
 def search_36kr(query, limit=5):
     """Search 36kr articles via agent-browser CLI."""
     url = f"https://36kr.com/search/articles/{quote(query)}"
-    # Escaping JS for shell
-    js_escaped = JS_36KR.replace("'", "'''")
-    cmd = f"agent-browser open '{url}' && (agent-browser wait '.kr-flow-article-item' || echo 'timeout') && agent-browser eval '{js_escaped}' && agent-browser close"
+    # One argv per step, no shell: JS_36KR must reach eval verbatim, and
+    # shell-quoting it dropped every quote in the script.
     try:
-        proc = subprocess.run(cmd, shell=True, capture_output=True, text=True, check=True)
+        subprocess.run(["agent-browser", "open", url], capture_output=True, text=True, check=True)
+        waited = subprocess.run(
+            ["agent-browser", "wait", ".kr-flow-article-item"], capture_output=True, text=True
+        )
+        if waited.returncode != 0:  # no results rendered in time
+            return []
+        proc = subprocess.run(
+            ["agent-browser", "eval", JS_36KR], capture_output=True, text=True, check=True
+        )
         result_json = proc.stdout.strip()
 
-        if not result_json or "timeout" in result_json.lower():
+        if not result_json:
             return []
 
-        match = re.search(r"(\[.*\])", result_json, re.DOTALL)
-        if match:
-            items = json.loads(match.group(1))
-            return items[:limit]
-        return []
+        cols = _decode_eval(result_json)
+        if not isinstance(cols, dict) or any(
+            not isinstance(cols.get(k), list) for k in _KR_COLUMNS
+        ):
+            print("[36kr] Error: unexpected extractor output", file=sys.stderr)
+            return []
+        rows = zip(*(cols[k] for k in _KR_COLUMNS))
+        return [
+            {
+                "source": "36kr",
+                "title": title,
+                "url": href,
+                "snippet": snippet,
+                "author": "36氪",
+                "date": date,
+            }
+            for title, href, snippet, date in itertools.islice(rows, limit)
+        ]
     except subprocess.CalledProcessError as e:
         print(f"[36kr] Error: agent-browser failed: {e.stderr}", file=sys.stderr)
-        subprocess.run("agent-browser close", shell=True, capture_output=True)
         return []
     except Exception as e:
         print(f"[36kr] Error: {e}", file=sys.stderr)
-        subprocess.run("agent-browser close", shell=True, capture_output=True)
         return []
+    finally:
+        _close_browser()
+
+
+def _decode_eval(text):
+    """Decode `agent-browser eval` stdout into the value the JS returned.
+
+    The extractors return JSON.stringify(...), so accept that string printed
+    either raw or JSON-quoted. Returns None if the output isn't JSON.
+    """
+    try:
+        value = loads(text)
+        if isinstance(value, str):
+            value = loads(value)
+    except JSONDecodeError:
+        return None
+    return value
+
+
+def _close_browser():
+    """Close the agent-browser page, ignoring failures."""
+    try:
+        subprocess.run(["agent-browser", "close"], capture_output=True)
+    except OSError:
+        pass
 
 
 def search_zhihu(query, limit=5):
@@ -205,7 +259,7 @@ def format_text(results):
 
 def format_json(results):
     """Format results as JSON."""
-    print(json.dumps(results, ensure_ascii=False, indent=2))
+    print(dumps_pretty(results))
 
 
 # --- CLI ---
@@ -221,6 +275,33 @@ ALL_SOURCES = {
 ALL_SEARCH_SOURCES = ["wechat", "36kr", "xhs"]
 
 
+def search_all(query, limit):
+    """Run the ALL_SEARCH_SOURCES side by side and merge results in order.
+
+    Each backend is a separate process/service, so wall time is the slowest
+    source rather than the sum. Workers are daemon threads, not a
+    ThreadPoolExecutor: the executor joins its workers at exit, so Ctrl-C
+    would wait out a blocked xiaohongshu-mcp call (up to 15s + 45s).
+    """
+    results = {}
+
+    def run(name):
+        try:
+            results[name] = ALL_SOURCES[name](query, limit)
+        except Exception as e:
+            print(f"[{name}] Error: {e}", file=sys.stderr)
+
+    threads = [
+        threading.Thread(target=run, args=(name,), daemon=True)
+        for name in ALL_SEARCH_SOURCES
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return [r for name in ALL_SEARCH_SOURCES for r in results.get(name, [])]
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Search Chinese content platforms"
@@ -258,14 +339,7 @@ def main():
         return
 
     if args.command == "all":
-        all_results = []
-        for name in ALL_SEARCH_SOURCES:
-            fn = ALL_SOURCES[name]
-            try:
-                results = fn(args.query, args.limit)
-                all_results.extend(results)
-            except Exception as e:
-                print(f"[{name}] Error: {e}", file=sys.stderr)
+        all_results = search_all(args.query, args.limit)
         if args.json_out:
             format_json(all_results)
         else:
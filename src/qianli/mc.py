@@ -3,18 +3,34 @@
 Runs MediaCrawler as a subprocess, reads JSON output, normalizes results.
 """
 
-import json
+import itertools
 import os
 import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+from datetime import datetime
 from pathlib import Path
 
+from qianli._json import loads
+
+try:
+    import ijson
+except ImportError:  # optional: qianli[speedups]
+    ijson = None
+
 MC_DIR = Path.home() / "code" / "MediaCrawler"
 MC_PYTHON = MC_DIR / ".venv" / "bin" / "python"
-MC_CONFIG = MC_DIR / "config" / "base_config.py"
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# MediaCrawler can only save to files; put them on tmpfs where there is one
+# so the write-then-read round-trip stays in RAM.
+MC_OUTPUT_ROOT = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+
+_STDERR_ERROR_RE = re.compile(r"error|exception", re.IGNORECASE)
 
 
 def _check_mc():
@@ -36,18 +52,30 @@ def _check_mc():
         sys.exit(1)
 
 
-def _patch_max_notes(limit):
-    """Temporarily patch CRAWLER_MAX_NOTES_COUNT in config."""
-    text = MC_CONFIG.read_text()
-    original = text
-    text = re.sub(
-        r"^CRAWLER_MAX_NOTES_COUNT\s*=\s*\d+",
-        f"CRAWLER_MAX_NOTES_COUNT = {limit}",
-        text,
-        flags=re.MULTILINE,
-    )
-    MC_CONFIG.write_text(text)
-    return original
+# Entry point passed to `python -c`: sets CRAWLER_MAX_NOTES_COUNT on the
+# in-memory config module (argv[1]) and then runs main.py with the remaining
+# args. MediaCrawler reads config.* at call time, the same way its own CLI
+# flags are applied, so base_config.py on disk is never touched and
+# concurrent searches don't race on it.
+_MC_BOOTSTRAP = (
+    "import runpy, sys\n"
+    "import config\n"
+    "config.CRAWLER_MAX_NOTES_COUNT = int(sys.argv.pop(1))\n"
+    "runpy.run_path('main.py', run_name='__main__')\n"
+)
+
+
+def _collect_errors(stream, lines):
+    """Append error-looking lines from MediaCrawler stderr, drop the rest.
+
+    Closes the stream once it hits EOF. The close happens on this thread
+    because closing from another one would block on the in-flight read.
+    """
+    with stream:
+        for raw in stream:
+            line = raw.decode("utf-8", errors="replace").strip()
+            if _STDERR_ERROR_RE.search(line):
+                lines.append(line)
 
 
 def _find_contents_json(output_dir, platform):
@@ -61,17 +89,39 @@ def _find_contents_json(output_dir, platform):
     return None
 
 
+def _read_items(json_file, limit):
+    """Read the first `limit` items from a MediaCrawler contents JSON file.
+
+    With ijson installed the array is streamed and parsing stops after
+    `limit` items; otherwise the whole file is decoded.
+    """
+    if ijson is not None:
+        with open(json_file, "rb") as f:
+            items = list(itertools.islice(ijson.items(f, "item", use_float=True), limit))
+        if items:
+            return items
+        # Empty array or a single top-level object: fall through
+
+    items = loads(json_file.read_bytes())
+    if not isinstance(items, list):
+        items = [items]
+    return items[:limit]
+
+
 def _ts_to_date(ts):
     """Convert unix timestamp (ms or s) to YYYY-MM-DD."""
     if not ts:
         return ""
+    if not isinstance(ts, int):
+        try:
+            ts = int(ts)
+        except (TypeError, ValueError):
+            return str(ts)
+    if ts > 1e12:  # milliseconds
+        ts = ts // 1000
     try:
-        ts = int(ts)
-        if ts > 1e12:  # milliseconds
-            ts = ts // 1000
-        from datetime import datetime
-        return datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
-    except (ValueError, OSError):
+        return datetime.fromtimestamp(ts).strftime(DATE_FORMAT)
+    except (ValueError, OSError, OverflowError):
         return str(ts)
 
 
@@ -134,16 +184,13 @@ def run_mc_search(platform, query, limit=5):
     """
     _check_mc()
 
-    output_dir = tempfile.mkdtemp(prefix="qianli-mc-")
-    original_config = None
+    output_dir = tempfile.mkdtemp(prefix="qianli-mc-", dir=MC_OUTPUT_ROOT)
 
     try:
-        # Patch max notes count
-        original_config = _patch_max_notes(limit)
-
         cmd = [
             str(MC_PYTHON),
-            "main.py",
+            "-c", _MC_BOOTSTRAP,
+            str(limit),
             "--platform", platform,
             "--type", "search",
             "--keywords", query,
@@ -155,21 +202,36 @@ def run_mc_search(platform, query, limit=5):
 
         print(f"[{platform}] Searching via MediaCrawler...", file=sys.stderr)
 
-        result = subprocess.run(
+        # stdout is never used and stderr can run to megabytes over a long
+        # crawl, so filter stderr as it streams rather than buffering it.
+        proc = subprocess.Popen(
             cmd,
             cwd=str(MC_DIR),
-            capture_output=True,
-            timeout=120,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        error_lines = []
+        reader = threading.Thread(
+            target=_collect_errors, args=(proc.stderr, error_lines), daemon=True
         )
+        reader.start()
+        try:
+            returncode = proc.wait(timeout=120)
+        except BaseException:
+            # Timeout, Ctrl-C or anything else: don't leave the crawler and
+            # its headless browser running (subprocess.run did the same)
+            proc.kill()
+            proc.wait()
+            raise
+        finally:
+            # Browser grandchildren can hold the pipe open; don't hang on them.
+            # The reader closes the pipe itself once it sees EOF.
+            reader.join(timeout=5)
 
-        if result.returncode != 0:
-            stderr = result.stderr.decode("utf-8", errors="replace").strip()
-            # Filter out common noise
-            if stderr:
-                for line in stderr.split("\n"):
-                    if "error" in line.lower() or "exception" in line.lower():
-                        print(f"[{platform}] {line}", file=sys.stderr)
-            print(f"[{platform}] MediaCrawler exited with code {result.returncode}", file=sys.stderr)
+        if returncode != 0:
+            for line in error_lines:
+                print(f"[{platform}] {line}", file=sys.stderr)
+            print(f"[{platform}] MediaCrawler exited with code {returncode}", file=sys.stderr)
             return []
 
         # Find and read the output JSON
@@ -178,14 +240,12 @@ def run_mc_search(platform, query, limit=5):
             print(f"[{platform}] No results found (JSON output missing)", file=sys.stderr)
             return []
 
-        items = json.loads(json_file.read_text(encoding="utf-8"))
-        if not isinstance(items, list):
-            items = [items]
+        items = _read_items(json_file, limit)
 
         normalizer = NORMALIZERS.get(platform)
         if normalizer:
-            return normalizer(items[:limit])
-        return items[:limit]
+            return normalizer(items)
+        return items
 
     except subprocess.TimeoutExpired:
         print(f"[{platform}] MediaCrawler timed out (120s)", file=sys.stderr)
@@ -194,8 +254,5 @@ def run_mc_search(platform, query, limit=5):
         print(f"[{platform}] Error: {e}", file=sys.stderr)
         return []
     finally:
-        # Restore config
-        if original_config is not None:
-            MC_CONFIG.write_text(original_config)
         # Clean up temp dir
         shutil.rmtree(output_dir, ignore_errors=True)
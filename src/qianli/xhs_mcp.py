@@ -7,15 +7,23 @@ Protocol: JSON-RPC 2.0 over HTTP POST to /mcp, with session management
 via the Mcp-Session-Id header.
 """
 
-import json
+import http.client
 import re
 import sys
 import urllib.parse
-import urllib.request
+
+from qianli._json import JSONDecodeError, dumps_bytes, loads
 
 MCP_URL = "http://localhost:18060/mcp"
 TIMEOUT = 45  # seconds per tool call
 
+_MCP_ADDR = urllib.parse.urlsplit(MCP_URL)
+
+# Feed response parsing, applied per line of every search result
+_JSON_ARRAY_RE = re.compile(r'\[[\s\S]*\]')
+_KV_RE = re.compile(r'\*?\*?(\w[\w_]*)\*?\*?\s*[:：]\s*(.*)')
+_BULLET_KV_RE = re.compile(r'[-•]\s*\*?\*?(\w[\w_]*)\*?\*?\s*[:：]\s*(.*)')
+
 
 class XHSMCPError(Exception):
     """Error communicating with xiaohongshu-mcp."""
@@ -31,14 +39,50 @@ class _Session:
     def __init__(self):
         self._session_id = None
         self._req_id = 0
+        self._conn = None  # keep-alive connection shared by all requests
 
     def _next_id(self):
         self._req_id += 1
         return self._req_id
 
+    def _request(self, data, headers, timeout):
+        """POST to MCP_URL over the keep-alive connection.
+
+        Returns (response, body); the body is read in full so the connection
+        can be reused.
+        If the server has dropped the idle connection, reconnects once.
+        """
+        while True:
+            reused = self._conn is not None
+            if not reused:
+                self._conn = http.client.HTTPConnection(
+                    _MCP_ADDR.hostname, _MCP_ADDR.port, timeout=timeout
+                )
+            # http.client reconnects on its own after a "Connection: close"
+            # response, using .timeout; a live socket needs it set directly.
+            self._conn.timeout = timeout
+            if self._conn.sock is not None:
+                self._conn.sock.settimeout(timeout)
+            try:
+                self._conn.request("POST", _MCP_ADDR.path, body=data, headers=headers)
+                resp = self._conn.getresponse()
+                return resp, resp.read()
+            except (http.client.BadStatusLine, ConnectionResetError, BrokenPipeError):
+                self._conn.close()
+                self._conn = None
+                if not reused:
+                    raise
+            except Exception:
+                self._conn.close()
+                self._conn = None
+                raise
+
     def _post(self, payload, *, timeout=TIMEOUT):
         """Send a JSON-RPC request and return the parsed response."""
-        data = json.dumps(payload).encode()
+        try:
+            data = dumps_bytes(payload)
+        except (TypeError, ValueError) as e:
+            raise XHSMCPError(f"Cannot encode request to xiaohongshu-mcp: {e}") from e
         headers = {
             "Content-Type": "application/json",
             "Accept": "application/json, text/event-stream",
@@ -46,40 +90,43 @@ class _Session:
         if self._session_id:
             headers["Mcp-Session-Id"] = self._session_id
 
-        req = urllib.request.Request(MCP_URL, data=data, headers=headers)
         try:
-            with urllib.request.urlopen(req, timeout=timeout) as resp:
-                # Capture session ID from response headers
-                sid = resp.headers.get("Mcp-Session-Id")
-                if sid:
-                    self._session_id = sid
-                body = resp.read().decode()
-                if not body:
-                    return None
-                return json.loads(body)
-        except (TimeoutError, OSError) as e:
+            resp, body = self._request(data, headers, timeout)
+        except ConnectionRefusedError as e:
+            raise XHSMCPError(
+                f"Cannot reach xiaohongshu-mcp at {MCP_URL}. "
+                f"Is the Docker container running? ({e})"
+            ) from e
+        except (TimeoutError, OSError, http.client.HTTPException) as e:
             raise XHSMCPError(
                 f"Request to xiaohongshu-mcp timed out after {timeout}s. "
                 f"The server may be waiting for login. ({e})"
             ) from e
-        except urllib.error.URLError as e:
+        if resp.status >= 400:
+            self._conn.close()
+            self._conn = None
             raise XHSMCPError(
-                f"Cannot reach xiaohongshu-mcp at {MCP_URL}. "
-                f"Is the Docker container running? ({e})"
-            ) from e
+                f"xiaohongshu-mcp returned HTTP {resp.status} {resp.reason}"
+            )
+
+        # Capture session ID from response headers
+        sid = resp.getheader("Mcp-Session-Id")
+        if sid:
+            self._session_id = sid
+        if not body:
+            return None
+        return loads(body)
 
     def _notify(self, method, params=None):
         """Send a JSON-RPC notification (no id, no response expected)."""
         payload = {"jsonrpc": "2.0", "method": method}
         if params:
             payload["params"] = params
-        data = json.dumps(payload).encode()
         headers = {"Content-Type": "application/json"}
         if self._session_id:
             headers["Mcp-Session-Id"] = self._session_id
-        req = urllib.request.Request(MCP_URL, data=data, headers=headers)
         try:
-            urllib.request.urlopen(req, timeout=5)
+            self._request(dumps_bytes(payload), headers, 5)
         except Exception:
             pass  # Notifications are fire-and-forget
 
@@ -151,11 +198,11 @@ def _parse_feed_items(text):
     We attempt JSON first, then fall back to text parsing.
     """
     # Try to find a JSON array in the response
-    json_match = re.search(r'\[[\s\S]*\]', text)
+    json_match = _JSON_ARRAY_RE.search(text)
     if json_match:
         try:
-            return json.loads(json_match.group())
-        except json.JSONDecodeError:
+            return loads(json_match.group())
+        except JSONDecodeError:
             pass
 
     # Parse structured text response — the MCP server returns formatted text
@@ -170,18 +217,14 @@ def _parse_feed_items(text):
                 current = {}
             continue
 
-        # Match "key: value" or "**key:** value" patterns
-        m = re.match(r'\*?\*?(\w[\w_]*)\*?\*?\s*[:：]\s*(.*)', line)
+        # Match "key: value" / "**key:** value", else "- key: value".
+        # The two can't both match: one needs a word char or "*" first,
+        # the other a bullet.
+        m = _KV_RE.match(line) or _BULLET_KV_RE.match(line)
         if m:
             key = m.group(1).lower().strip("*")
             val = m.group(2).strip()
             current[key] = val
-        # Match "- key: value" patterns
-        m2 = re.match(r'[-•]\s*\*?\*?(\w[\w_]*)\*?\*?\s*[:：]\s*(.*)', line)
-        if m2:
-            key = m2.group(1).lower().strip("*")
-            val = m2.group(2).strip()
-            current[key] = val
 
     if current:
         items.append(current)